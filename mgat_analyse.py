@@ -18,6 +18,7 @@ from utils import *
 from plot_lib.plotter import *
 from sklearn.decomposition import PCA
 from sklearn.ensemble import RandomForestClassifier, AdaBoostClassifier
+from sklearn.metrics import accuracy_score
 from model import utils
 from model import models
 
@@ -140,8 +141,10 @@ if __name__ == "__main__":
 
         plt.title(f"Correlation Accuracy Comparison for {args.type}")
         correlation_accuracy_plot_path = os.path.join(save_dir, f"correlation_accuracy_{args.uuid}_{args.cluster_type}.pdf")
-        plt.savefig(correlation_accuracy_plot_path, bbox_inches='tight')
-        plt.close()
+        fig = plt.gcf()
+        fig.set_layout_engine("constrained")
+        save_figure(fig, correlation_accuracy_plot_path)
+        plt.close(fig)
         logger.info(f"Saved plot '{correlation_accuracy_plot_path}'")
 
     if args.shannon:
@@ -189,8 +192,10 @@ if __name__ == "__main__":
 
         plt.title(f"Average Shannon Entropy Comparison for {args.cluster_type}")
         entropy_path = os.path.join(save_dir, f"entropy_averages_{args.uuid}_{args.cluster_type}.pdf")
-        plt.savefig(entropy_path, bbox_inches='tight')
-        plt.close()
+        fig = plt.gcf()
+        fig.set_layout_engine("constrained")
+        save_figure(fig, entropy_path)
+        plt.close(fig)
         logger.info(f"Saved plot '{entropy_path}'")
 
     if args.classifier:
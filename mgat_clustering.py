@@ -8,11 +8,10 @@ import model
 from tqdm import tqdm
 from utils import *
 from matplotlib import pyplot as plt
-from sklearn.metrics import confusion_matrix, homogeneity_score, davies_bouldin_score, calinski_harabasz_score, silhouette_score
+from sklearn.metrics import confusion_matrix, homogeneity_score
 from model import utils, models
-from plot_lib import plotter, interactive_plotter
+from plot_lib import plotter, interactive_plotter, save_figure
 from preprocessor import preprocessor as p, signal_processor as sp
-from scipy.spatial.distance import mahalanobis
 
 matplotlib.use('TkAgg')
 
@@ -78,7 +77,7 @@ def _add_shortest_path(shortest_path, data_points, start_point, end_point, path,
 
     # save
     plt.legend()
-    plt.savefig(path, bbox_inches='tight')
+    save_figure(ax.figure, path)
     plt.autoscale()
 
 def _fit_new(new_file_path: str, model: models.MetricLeaner, signal_func_name: str, segment_duration: int, sample_rate: int, fig: plt.Figure, ax: plt.Axes, path: str, overlap_ratio: float = 0.3):
@@ -121,28 +120,10 @@ def _fit_new(new_file_path: str, model: models.MetricLeaner, signal_func_name: s
     ax.plot(new_fitted[:, 0], new_fitted[:, 1], color="purple", linestyle="-", label=file_name, linewidth=1)
 
     ax.legend()
-    plt.savefig(path, bbox_inches='tight')
+    save_figure(fig, path)
 
     return fig, ax
 
-
-def _mahalanobis_distance_matrix(X, VI):
-    """
-    Compute pairwise Mahalanobis distance matrix for dataset X given inverse covariance matrix VI.
-
-    :param X: latent space
-    :param VI: inverse covariance matrix
-    :return: distance matrix
-    """
-    n_samples = X.shape[0]
-    dist_matrix = np.zeros((n_samples, n_samples))
-
-    for i in range(n_samples):
-        for j in range(n_samples):
-            dist_matrix[i, j] = mahalanobis(X[i], X[j], VI)
-
-    return dist_matrix
-
 if __name__ == "__main__":
     args = parser.parse_args()
     config = config.Config(path=args.config)
@@ -246,14 +227,10 @@ if __name__ == "__main__":
     prom_genres = "Most Common Genre per Cluster: " + ', '.join([f"{k}: {v}" for k, v in _prominent_genres(cluster_stats).items()])
     logger.info(prom_genres)
     logger.info(f"homogeneity score: {homogeneity_score(y_true, y_pred):.4f}")
-    logger.info(f"davies bouldin score: {davies_bouldin_score(latent_space, y_pred):.4f}")
-    logger.info(f"calinski harabasz score: {calinski_harabasz_score(latent_space, y_pred):.4f}")
-
-    if inv_covar is not None:
-        dist_matrix = _mahalanobis_distance_matrix(latent_space, inv_covar)
-        logger.info(f"silhouette score: {silhouette_score(dist_matrix, y_pred, metric='precomputed'):.4f}")
-    else:
-        logger.info(f"silhouette score: {silhouette_score(latent_space, y_pred):.4f}")
+    davies_bouldin, calinski_harabasz, silhouette = utils.cluster_metrics(latent_space, y_pred, covar=inv_covar)
+    logger.info(f"davies bouldin score: {davies_bouldin:.4f}")
+    logger.info(f"calinski harabasz score: {calinski_harabasz:.4f}")
+    logger.info(f"silhouette score: {silhouette:.4f}")
 
     plt.show()
 
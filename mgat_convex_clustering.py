@@ -6,12 +6,12 @@ import numpy as np
 import model
 import logger
 
-from sklearn.metrics import homogeneity_score, davies_bouldin_score, calinski_harabasz_score, silhouette_score
+from sklearn.metrics import homogeneity_score
 from model import models, utils
 from plot_lib import plotter
 from utils import get_genre_filter
 
-matplotlib.use('TkAgg')
+matplotlib.use('Agg')
 
 parser = argparse.ArgumentParser(prog='Music Genre Analysis Tool - Convex Clustering', formatter_class=argparse.RawDescriptionHelpFormatter)
 parser.add_argument("-c", "--config", required=True, help="Config file")
@@ -40,10 +40,13 @@ if __name__ == "__main__":
     u_path = convex_cluster_model.convex_cluster(lambda_vals=lambda_values, k=args.k_val)
 
     path = os.path.join(root, f"convex_clustering_{args.uuid}_{args.lambda_val}_{args.k_val}_{args.genres}.pdf")
-    plotter.plot_convex_clusters(latent_space=convex_cluster_model.latent_space, u_path=u_path, y_true=convex_cluster_model.y_true, loader=loader, path=path)
+    unique_labels = np.unique(convex_cluster_model.y_true)
+    str_labels = loader.decode_label(unique_labels)
+    plotter.plot_convex_clusters(latent_space=convex_cluster_model.latent_space, u_path=u_path, y_true=convex_cluster_model.y_true, loader=loader, path=path, unique_labels=unique_labels, str_labels=str_labels)
     logger.info(f"Saved plot '{path}'")
 
     logger.info(f"homogeneity score: {homogeneity_score(convex_cluster_model.y_true, convex_cluster_model.y_pred):.4f}")
-    logger.info(f"davies bouldin score: {davies_bouldin_score(convex_cluster_model.latent_space, convex_cluster_model.y_pred):.4f}")
-    logger.info(f"calinski harabasz score: {calinski_harabasz_score(convex_cluster_model.latent_space, convex_cluster_model.y_pred):.4f}")
-    logger.info(f"silhouette score: {silhouette_score(convex_cluster_model.latent_space, convex_cluster_model.y_pred):.4f}")
+    davies_bouldin, calinski_harabasz, silhouette = utils.cluster_metrics(convex_cluster_model.latent_space, convex_cluster_model.y_pred)
+    logger.info(f"davies bouldin score: {davies_bouldin:.4f}")
+    logger.info(f"calinski harabasz score: {calinski_harabasz:.4f}")
+    logger.info(f"silhouette score: {silhouette:.4f}")
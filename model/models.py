@@ -7,6 +7,7 @@ from sklearn.decomposition import PCA
 from sklearn.manifold import TSNE
 from sklearn.metrics import euclidean_distances
 from sklearn.mixture import GaussianMixture
+from joblib import Parallel, delayed, effective_n_jobs
 from tqdm import tqdm
 from model import utils
 
@@ -42,6 +43,57 @@ def get_dim_model(model_type: str):
     else:
         raise TypeError("Model type must be 'pca' or 'umap' or 'tsne'")
 
+def _convex_cluster_problem(latent_space: np.ndarray, weights: np.ndarray):
+    """
+    Builds the convex clustering problem with lambda as a parameter, so it is only compiled once and can be re-solved
+    for every lambda value.
+
+    :param latent_space: latent space
+    :param weights: k nearest neighbour weight matrix
+    :return: problem, cluster centre variable, lambda parameter
+    """
+
+    n, m = latent_space.shape
+    cluster_centre = cp.Variable((n, m))
+    lambda_param = cp.Parameter(nonneg=True)
+
+    # the loss function
+    loss_func = 0.5 * cp.sum_squares(latent_space - cluster_centre)
+
+    # the penalisation function
+    # these calculations have been vectorised for performance opt.
+    diff = cp.reshape(cluster_centre, (n, 1, m), order="F") - cp.reshape(cluster_centre, (1, n, m), order="F")
+    diff_flat = cp.reshape(diff, (n * n, m), order="F")
+    norms_flat = cp.norm(diff_flat, 2, axis=1)
+    norms = cp.reshape(norms_flat, (n, n), order="F")
+    penalty_func = lambda_param * 0.5 * cp.sum(cp.multiply(weights, norms))
+
+    # minimise this loss function
+    minimise_pen_loss_func = cp.Problem(cp.Minimize(loss_func + penalty_func))
+
+    return minimise_pen_loss_func, cluster_centre, lambda_param
+
+def _solve_convex_cluster_path(latent_space: np.ndarray, weights: np.ndarray, lambda_vals: np.ndarray) -> np.ndarray:
+    """
+    Solves the convex clustering problem for a block of lambda values. The problem is only compiled once, each lambda
+    value just updates the parameter and re-solves.
+
+    :param latent_space: latent space
+    :param weights: k nearest neighbour weight matrix
+    :param lambda_vals: lambda vals
+    :return: cluster centre path (shape: [len(lambda_vals),n,m])
+    """
+
+    problem, cluster_centre, lambda_param = _convex_cluster_problem(latent_space, weights)
+
+    path = np.empty((len(lambda_vals), *latent_space.shape))
+    for t, lambda_val in enumerate(lambda_vals):
+        lambda_param.value = lambda_val
+        problem.solve()
+        path[t] = cluster_centre.value
+
+    return path
+
 class MetricLeaner:
     def __init__(self, loader: utils.Loader, n_clusters: int, cluster_type: str):
         """
@@ -136,13 +188,14 @@ class ConvexCluster:
         self.latent_space = self.dim_reducer.fit_transform(tmp).astype(np.float64)
         del tmp
 
-    def convex_cluster(self, lambda_vals, k):
+    def convex_cluster(self, lambda_vals, k, n_jobs: int = -1):
         """
         Minimises a penalising loss function over a range of lambda values to show the evolution of the cluster centres.
 
         :param lambda_vals: lambda vals
         :param k: k nearest neighbours
-        :return:
+        :param n_jobs: number of processes used to solve the lambda values, -1 uses all cores
+        :return: cluster centre path (shape: [len(lambda_vals),n,m])
         """
 
         n, m = self.latent_space.shape
@@ -155,28 +208,24 @@ class ConvexCluster:
             nearest = np.argsort(dists[i])[:k]
             weights[i, nearest] = np.exp(-dists[i, nearest] ** 2)
 
-        tqdm_loop = tqdm(lambda_vals, desc="Clustering...")
-        for lambda_val in tqdm_loop:
-            cluster_centre = cp.Variable((n, m))
-
-            # the loss function
-            loss_func = 0.5 * cp.sum_squares(self.latent_space - cluster_centre)
-
-            # the penalisation function
-            # these calculations have been vectorised for performance opt.
-            diff = cp.reshape(cluster_centre, (n, 1, m), order="F") - cp.reshape(cluster_centre, (1, n, m), order="F")
-            diff_flat = cp.reshape(diff, (n * n, m), order="F")
-            norms_flat = cp.norm(diff_flat, 2, axis=1)
-            norms = cp.reshape(norms_flat, (n, n), order="F")
-            penalty_func = lambda_val * 0.5 * cp.sum(cp.multiply(weights, norms))
+        self.clustering_path = np.empty((len(lambda_vals), n, m))
 
-            # minimise this loss function
-            minimise_pen_loss_func = cp.Problem(cp.Minimize(loss_func + penalty_func))
-            minimise_pen_loss_func.solve()
+        # each lambda value is solved independently, so the sweep is split into one block per process. each process
+        # compiles the problem once and solves its whole block
+        n_blocks = min(effective_n_jobs(n_jobs), len(lambda_vals))
+        blocks = np.array_split(np.asarray(lambda_vals), n_blocks)
+        solves = Parallel(n_jobs=n_jobs, backend="loky", return_as="generator")(
+            delayed(_solve_convex_cluster_path)(self.latent_space, weights, block) for block in blocks
+        )
 
-            self.clustering_path.append(cluster_centre.value)
+        t = 0
+        with tqdm(total=len(lambda_vals), desc="Clustering...") as tqdm_loop:
+            for block_path in solves:
+                self.clustering_path[t:t + len(block_path)] = block_path
+                t += len(block_path)
+                tqdm_loop.update(len(block_path))
 
-        self.centres = np.array(self.clustering_path[-1])
+        self.centres = self.clustering_path[-1]
         self.y_pred = self._create_labels()
 
         return self.clustering_path
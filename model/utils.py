@@ -8,7 +8,7 @@ from tqdm import tqdm
 import torch
 from sklearn.preprocessing import LabelEncoder
 from torch.utils.data import TensorDataset, DataLoader
-from scipy.spatial.distance import mahalanobis, euclidean
+from scipy.spatial.distance import mahalanobis, euclidean, cdist
 
 
 class ReceiptReader:
@@ -394,6 +394,52 @@ def correlation(latent_space: np.ndarray, y_true: np.ndarray, covar: np.ndarray,
 
     return neighbours_true, neighbours_pred
 
+def correlation_sweep(latent_space: np.ndarray, y_true: np.ndarray, covar: np.ndarray, max_n_neighbours: int = 100) -> np.ndarray:
+    """
+    Works out the nearest neighbour correlation accuracy for every 'n' from 1 to 'max_n_neighbours' in a single pass.
+    This gives the same accuracies as calling 'correlation' for each 'n', but the distance matrix and neighbour ordering
+    are only computed once. If no covariance matrix is provided, the Euclidean distance will be used.
+
+    :param latent_space: latent space
+    :param y_true: true labels
+    :param covar: covariance matrix. If set to None, Euclidean distance metric will be used
+    :param max_n_neighbours: the maximum number of nearest neighbours
+    :return: array of accuracies (shape: [max_n_neighbours,])
+    """
+
+    y_true = np.asarray(y_true)
+    n_points = len(latent_space)
+
+    if covar is None:
+        dists = cdist(latent_space, latent_space)
+    else:
+        dists = cdist(latent_space, latent_space, metric="mahalanobis", VI=covar)
+
+    # like 'find_nearest_neighbours', each point is counted as its own nearest neighbour
+    k = min(max_n_neighbours + 1, n_points)
+    if k < n_points:
+        nearest = np.argpartition(dists, k - 1, axis=1)[:, :k]
+
+        # argpartition picks arbitrarily between points tied at the kth distance, so those rows fall back to a stable
+        # sort to pick the lowest indices, like the stable 'sorted' in 'find_nearest_neighbours'
+        kth_dists = np.take_along_axis(dists, nearest, axis=1).max(axis=1)
+        tied = (dists <= kth_dists[:, None]).sum(axis=1) > k
+        if tied.any():
+            nearest[tied] = np.argsort(dists[tied], axis=1, kind="stable")[:, :k]
+    else:
+        nearest = np.tile(np.arange(n_points), (n_points, 1))
+
+    # only sort the k closest points, breaking distance ties by index
+    order = np.lexsort((nearest, np.take_along_axis(dists, nearest, axis=1)), axis=1)
+    nearest = np.take_along_axis(nearest, order, axis=1)
+    del dists
+
+    # number of matching labels at each neighbour rank, accumulated over the ranks
+    matches = np.cumsum((y_true[nearest] == y_true[:, None]).sum(axis=0))
+
+    n_neighbours = np.minimum(np.arange(1, max_n_neighbours + 1) + 1, k)
+    return matches[n_neighbours - 1] / (n_points * n_neighbours)
+
 def correlation_metrics(y_true, y_pred):
     """
     Get f1 score, precision, recall, and accuracy of y true and y pred labels
@@ -410,6 +456,91 @@ def correlation_metrics(y_true, y_pred):
 
     return f1, precision, recall, acc
 
+def _chunked_silhouette(latent_space: np.ndarray, y: np.ndarray, counts: np.ndarray, covar: np.ndarray = None, chunk_size: int = 1024) -> float:
+    """
+    Works out the mean silhouette score one block of rows at a time so only a (chunk_size, n) slice of the distance
+    matrix is held in memory. If no covariance matrix is provided, the Euclidean distance will be used.
+
+    :param latent_space: latent space
+    :param y: labels encoded as 0 to n_labels - 1
+    :param counts: number of points in each cluster
+    :param covar: covariance matrix. If set to None, Euclidean distance metric will be used
+    :param chunk_size: number of rows per chunk
+    :return: silhouette score
+    """
+
+    n_samples = len(latent_space)
+    one_hot = np.zeros((n_samples, len(counts)))
+    one_hot[np.arange(n_samples), y] = 1
+
+    sil_samples = np.empty(n_samples)
+    for start in range(0, n_samples, chunk_size):
+        end = min(start + chunk_size, n_samples)
+        if covar is None:
+            dists = cdist(latent_space[start:end], latent_space)
+        else:
+            dists = cdist(latent_space[start:end], latent_space, metric="mahalanobis", VI=covar)
+
+        # sum of distances from each point in the chunk to every cluster
+        cluster_dists = dists @ one_hot
+        rows = np.arange(end - start)
+        y_chunk = y[start:end]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            intra = cluster_dists[rows, y_chunk] / (counts[y_chunk] - 1)
+            cluster_dists[rows, y_chunk] = np.inf
+            inter = np.min(cluster_dists / counts, axis=1)
+            sil_samples[start:end] = (inter - intra) / np.maximum(intra, inter)
+
+    # points in a cluster of their own have a score of 0
+    return float(np.mean(np.nan_to_num(sil_samples)))
+
+def cluster_metrics(latent_space: np.ndarray, y_pred: np.ndarray, covar: np.ndarray = None, chunk_size: int = 1024):
+    """
+    Get the davies bouldin score, calinski harabasz score, and silhouette score of a clustering. The cluster centroids are
+    worked out once and shared by the davies bouldin and calinski harabasz scores. The silhouette score is worked out in
+    chunks so the full pairwise distance matrix is never held in memory.
+
+    :param latent_space: latent space
+    :param y_pred: predicted labels
+    :param covar: covariance matrix for the silhouette score. If set to None, Euclidean distance metric will be used
+    :param chunk_size: number of rows per chunk when working out the silhouette score
+    :return: davies bouldin score, calinski harabasz score, silhouette score
+    """
+
+    n_samples = len(latent_space)
+    _, y = np.unique(y_pred, return_inverse=True)
+    n_labels = y.max() + 1
+    if not 1 < n_labels < n_samples:
+        raise ValueError(f"Number of labels is {n_labels}. Valid values are 2 to n_samples - 1 (inclusive)")
+
+    # cluster centroids in a single pass over the latent space
+    counts = np.bincount(y, minlength=n_labels)
+    centroids = np.zeros((n_labels, latent_space.shape[1]))
+    np.add.at(centroids, y, latent_space)
+    centroids /= counts[:, None]
+    sq_dists = ((latent_space - centroids[y]) ** 2).sum(axis=1)
+
+    # calinski harabasz
+    intra_disp = sq_dists.sum()
+    extra_disp = (counts * ((centroids - latent_space.mean(axis=0)) ** 2).sum(axis=1)).sum()
+    calinski_harabasz = 1.0 if intra_disp == 0.0 else extra_disp * (n_samples - n_labels) / (intra_disp * (n_labels - 1.0))
+
+    # davies bouldin
+    intra_dists = np.bincount(y, weights=np.sqrt(sq_dists), minlength=n_labels) / counts
+    centroid_dists = cdist(centroids, centroids)
+    if np.allclose(intra_dists, 0) or np.allclose(centroid_dists, 0):
+        davies_bouldin = 0.0
+    else:
+        centroid_dists[centroid_dists == 0] = np.inf
+        combined_intra_dists = intra_dists[:, None] + intra_dists[None, :]
+        davies_bouldin = np.mean(np.max(combined_intra_dists / centroid_dists, axis=1))
+
+    # silhouette
+    silhouette = _chunked_silhouette(latent_space, y, counts, covar=covar, chunk_size=chunk_size)
+
+    return davies_bouldin, calinski_harabasz, silhouette
+
 def connected_graph(latent_space: np.ndarray, covar: np.ndarray, n_neighbours: int = 5) -> dict:
     """
     Creates an undirected weighted graph, given a nearest neighbour value, of every point and what its distance is from
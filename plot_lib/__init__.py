@@ -1,3 +1,5 @@
+import functools
+import os
 import matplotlib
 import numpy as np
 import pandas as pd
@@ -6,11 +8,46 @@ import squarify
 from kneed import KneeLocator
 
 from matplotlib import pyplot as plt
-from matplotlib.colors import ListedColormap
-from matplotlib.patches import Ellipse
+from matplotlib.cm import ScalarMappable
+from matplotlib.collections import LineCollection
+from matplotlib.colors import ListedColormap, Normalize
+from matplotlib.patches import Ellipse, Polygon
+from scipy.spatial import Voronoi
 from sklearn.cluster import KMeans
 
 matplotlib.use('TkAgg')
 
+# smaller and faster pdf output
+plt.rcParams['pdf.compression'] = 6
+plt.rcParams['path.simplify'] = True
+plt.rcParams['path.simplify_threshold'] = 1.0
+
 colour_map_name = "hat"
-CMAP = pypalettes.load_cmap(colour_map_name)
\ No newline at end of file
+CMAP = pypalettes.load_cmap(colour_map_name)
+
+@functools.lru_cache(maxsize=16)
+def get_cached_listed_cmap(n_colours: int, cmap_name: str = colour_map_name) -> ListedColormap:
+    """
+    Creates a listed colour map of evenly spaced colours. These are cached as the colour maps and the number of genres
+    stay the same across a run, so the same colour maps are otherwise rebuilt for every plot.
+
+    :param n_colours: number of colours
+    :param cmap_name: pypalettes colour map name
+    :return: listed colour map
+    """
+
+    colour_map = CMAP if cmap_name == colour_map_name else pypalettes.load_cmap(cmap_name)
+    return ListedColormap(colour_map(np.linspace(0, 1, n_colours)))
+
+def save_figure(fig, path: str, **kwargs) -> None:
+    """
+    Saves a figure. Figures are created with constrained layout, so the extra draw pass from bbox_inches='tight' is
+    skipped. The creator and producer metadata is also dropped from PDFs.
+
+    :param fig: figure to save
+    :param path: path to save
+    :param kwargs: extra savefig kwargs
+    """
+
+    metadata = {"Creator": None, "Producer": None} if os.path.splitext(path)[1] == ".pdf" else None
+    fig.savefig(path, metadata=metadata, **kwargs)
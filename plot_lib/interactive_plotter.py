@@ -36,14 +36,13 @@ def interactive_gmm(gmm, data_points: list[CustomPoint], title: str, path: str)
     Plot Gaussian Mixture Model with ellipses around points.
     """
 
-    fig, ax = plt.subplots()
+    fig, ax = plt.subplots(constrained_layout=True)
 
     x = [p.x for p in data_points]
     y = [p.y for p in data_points]
     labels = [p.y_pred for p in data_points]
 
-    colours = [CMAP(i / (gmm.n_components - 1)) for i in range(gmm.n_components)]
-    cmap = ListedColormap(colours)
+    cmap = get_cached_listed_cmap(gmm.n_components)
 
     scatter = ax.scatter(x, y, c=labels, s=10, cmap=cmap, zorder=2, picker=5)
     ax.axis('equal')
@@ -63,7 +62,7 @@ def interactive_gmm(gmm, data_points: list[CustomPoint], title: str, path: str)
 
     callback = partial(_show_nearest_neighbours, fig=fig, ax=ax, data_points=data_points, path=path)
     fig.canvas.mpl_connect('pick_event', callback)
-    plt.savefig(path, bbox_inches='tight')
+    save_figure(fig, path)
     return ax, fig
 
 def interactive_kmeans(kmeans, data_points: list[CustomPoint], title: str, path: str, h: float = 0.02) -> (plt.Axes, plt.Figure):
@@ -77,15 +76,13 @@ def interactive_kmeans(kmeans, data_points: list[CustomPoint], title: str, path:
     :param h: step size for the grid used to create the mesh for plotting the decision boundaries
     """
 
-    fig, ax = plt.subplots()
+    fig, ax = plt.subplots(constrained_layout=True)
 
     x = np.array([p.x for p in data_points])
     y = np.array([p.y for p in data_points])
 
     # Colour map
-    colour_map = pypalettes.load_cmap("Benedictus")
-    colours = [colour_map(i / (kmeans.n_clusters - 1)) for i in range(kmeans.n_clusters)]
-    cmap = ListedColormap(colours)
+    cmap = get_cached_listed_cmap(kmeans.n_clusters, "Benedictus")
 
     # Plot the decision boundary
     x_min, x_max = x.min() - 1, x.max() + 1
@@ -122,7 +119,7 @@ def interactive_kmeans(kmeans, data_points: list[CustomPoint], title: str, path:
     # Event connection
     fig.canvas.mpl_connect('pick_event', partial(_show_nearest_neighbours, fig=fig, ax=ax, data_points=data_points, path=path))
 
-    fig.savefig(path, bbox_inches='tight')
+    save_figure(fig, path)
     return ax, fig
 
 
@@ -152,5 +149,5 @@ def _show_nearest_neighbours(event, fig, ax, data_points, path):
         if not os.path.exists(picked_dir):
             os.makedirs(picked_dir)
         file_path = os.path.join(picked_dir, f"{file_name}_nearest_neighbours.pdf")
-        plt.savefig(file_path, bbox_inches='tight')
+        save_figure(fig, file_path)
     fig.canvas.draw()
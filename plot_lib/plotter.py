@@ -1,6 +1,3 @@
-import seaborn as sns
-
-from sklearn.metrics import accuracy_score
 from model import utils
 from plot_lib import *
 
@@ -14,22 +11,18 @@ def plot_tree_map(cluster_stats: dict, path: str) -> None:
     n_cols = 4
     n_rows = int(np.ceil(len(cluster_stats) / n_cols))
 
-    fig, axes = plt.subplots(n_rows, n_cols, figsize=(n_cols * 4, n_rows * 4))
+    fig, axes = plt.subplots(n_rows, n_cols, figsize=(n_cols * 4, n_rows * 4), constrained_layout=True)
     axes = axes.flatten()
 
     for i, (cluster_key, values) in enumerate(cluster_stats.items()):
-        labels = []
-        sizes = []
-        for key, value in values.items():
-            labels.append(key)
-            sizes.append(cluster_stats[cluster_key][key])
+        keys = list(values.keys())
+        sizes = np.fromiter(values.values(), dtype=np.float64, count=len(values))
 
-        category_codes, unique_categories = pd.factorize(np.array(list(values.keys())))
-        colours = [CMAP(code) for code in category_codes]
+        category_codes, unique_categories = pd.factorize(np.asarray(keys))
+        colours = CMAP(category_codes)
 
-        total = sum(sizes)
-        percentages = [round(s/total, 2) for s in sizes]
-        labels = [f"{l}: {p}" for l, p in zip(labels, percentages)]
+        percentages = np.round(sizes / sizes.sum(), 2)
+        labels = [f"{l}: {p}" for l, p in zip(keys, percentages)]
 
         ax = axes[i]
         ax.set_axis_off()
@@ -52,11 +45,10 @@ def plot_tree_map(cluster_stats: dict, path: str) -> None:
     for j in range(i + 1, len(axes)):
         axes[j].set_visible(False)
 
-    plt.tight_layout()
-    plt.savefig(path, bbox_inches='tight')
-    plt.close()
+    save_figure(fig, path)
+    plt.close(fig)
 
-def plot_2d_kmeans_boundaries(latent_space: np.ndarray, kmeans, path: str, title: str, genre_filter: str, h: float = 0.02) -> None:
+def plot_2d_kmeans_boundaries(latent_space: np.ndarray, kmeans, path: str, title: str, genre_filter: str, h: float = None, grid_size: int = 500, max_voronoi_clusters: int = 200) -> None:
     """
     Plots the kmeans decision boundaries
 
@@ -65,45 +57,69 @@ def plot_2d_kmeans_boundaries(latent_space: np.ndarray, kmeans, path: str, title
     :param kmeans: KMeans object
     :param path: path to save
     :param genre_filter: genre filter
-    :param h: step size for the grid used to create the mesh for plotting the decision boundaries
+    :param h: step size for the grid used to create the mesh for plotting the decision boundaries. If set to None, it is scaled to the latent space range
+    :param grid_size: the number of grid steps along the widest axis when 'h' is None
+    :param max_voronoi_clusters: the maximum number of clusters to draw as voronoi cells. Above this, the boundaries are drawn from a grid
     """
 
     # colour map
-    colour_map = pypalettes.load_cmap("Benedictus")
-    colours = [colour_map(i / (kmeans.n_clusters - 1)) for i in range(kmeans.n_clusters)]
-    cmap = ListedColormap(colours)
+    cmap = get_cached_listed_cmap(kmeans.n_clusters, "Benedictus")
+    centres = kmeans.cluster_centers_
 
     # plot the decision boundary
     x_min, x_max = latent_space[:, 0].min() - 1, latent_space[:, 0].max() + 1
     y_min, y_max = latent_space[:, 1].min() - 1, latent_space[:, 1].max() + 1
-    xx, yy = np.meshgrid(np.arange(x_min, x_max, h), np.arange(y_min, y_max, h))
-
-    # obtain labels for each point in mesh. Use last trained model.
-    grid_points = np.c_[xx.ravel(), yy.ravel()]
-    Z = kmeans.predict(grid_points)
 
-    # Put the result into a color plot
-    Z = Z.reshape(xx.shape)
-    plt.figure(1)
-    plt.clf()
-    img = plt.imshow(Z, interpolation="nearest", extent=(xx.min(), xx.max(), yy.min(), yy.max()), cmap=cmap, aspect="auto", origin="lower")
-    plt.plot(latent_space[:, 0], latent_space[:, 1], "k.", markersize=2)
+    fig, ax = plt.subplots(constrained_layout=True)
+    if kmeans.n_clusters <= max_voronoi_clusters:
+        # the k-means decision boundaries are exactly the voronoi cells of the centres. four far away dummy points
+        # are added so that every real cell is finite and can be drawn as a polygon
+        span = max(x_max - x_min, y_max - y_min)
+        mid = np.array([(x_min + x_max) / 2, (y_min + y_max) / 2])
+        dummy_points = mid + 10 * span * np.array([[-1, -1], [-1, 1], [1, -1], [1, 1]])
+        vor = Voronoi(np.vstack([centres, dummy_points]))
+
+        for i in range(kmeans.n_clusters):
+            region = vor.regions[vor.point_region[i]]
+            ax.add_patch(Polygon(vor.vertices[region], closed=True, facecolor=cmap(i), edgecolor="none"))
+
+        img = ScalarMappable(norm=Normalize(vmin=0, vmax=kmeans.n_clusters - 1), cmap=cmap)
+    else:
+        if h is None:
+            h = max(x_max - x_min, y_max - y_min) / grid_size
+        # the grid is only used for plotting so float32 is precise enough
+        xs = np.arange(x_min, x_max, h, dtype=np.float32)
+        ys = np.arange(y_min, y_max, h, dtype=np.float32)
+        grid_points = np.empty((ys.size * xs.size, 2), dtype=np.float32)
+        grid_points[:, 0] = np.tile(xs, ys.size)
+        grid_points[:, 1] = np.repeat(ys, xs.size)
+
+        # obtain labels for each point in mesh. Use last trained model.
+        # ||x||^2 is the same for every centre so it drops out of the argmin
+        grid_centres = centres.astype(np.float32)
+        centre_norms = (grid_centres * grid_centres).sum(axis=1)
+        Z = np.argmin(centre_norms[None, :] - 2 * grid_points @ grid_centres.T, axis=1)
+
+        # Put the result into a color plot
+        Z = Z.reshape(ys.size, xs.size)
+        img = ax.imshow(Z, interpolation="nearest", extent=(xs[0], xs[-1], ys[0], ys[-1]), cmap=cmap, aspect="auto", origin="lower")
+
+    ax.plot(latent_space[:, 0], latent_space[:, 1], "k.", markersize=2)
 
     # plot the centroids as a white X
-    centroids = kmeans.cluster_centers_
-    plt.scatter(centroids[:, 0], centroids[:, 1], marker="x", s=169, linewidths=3, color="w", zorder=10)
-    plt.title(f"K-means Clustering Boundaries \n (genres: {genre_filter})")
-    plt.xlim(x_min, x_max)
-    plt.ylim(y_min, y_max)
-    plt.xticks(())
-    plt.yticks(())
+    ax.scatter(centres[:, 0], centres[:, 1], marker="x", s=169, linewidths=3, color="w", zorder=10)
+    ax.set_title(f"{title} \n (genres: {genre_filter})")
+    ax.set_xlim(x_min, x_max)
+    ax.set_ylim(y_min, y_max)
+    ax.set_xticks(())
+    ax.set_yticks(())
 
     # adding the colour bar
-    colorbar = plt.colorbar(img, ticks=range(kmeans.n_clusters))
+    colorbar = fig.colorbar(img, ax=ax, ticks=range(kmeans.n_clusters))
     colorbar.set_label('Cluster Labels', rotation=270, labelpad=15)
     colorbar.set_ticklabels([f"Cluster {i}" for i in range(kmeans.n_clusters)])
-    plt.title(title)
-    plt.savefig(path, bbox_inches='tight')
+    save_figure(fig, path)
+    plt.close(fig)
 
 def plot_eigenvalues(path, pca_model, title) -> None:
     """
@@ -114,15 +130,16 @@ def plot_eigenvalues(path, pca_model, title) -> None:
     :param title: title
     """
 
+    fig = plt.figure(constrained_layout=True)
     plt.plot([i for i in range(1, pca_model.n_components + 1)], pca_model.explained_variance_, marker="o", linestyle="-", label="Eigenvalues")
     plt.xlabel("Number of Components")
     plt.ylabel("Explained Variance (log)")
     plt.yscale("log")
     plt.title(title)
-    plt.savefig(path, bbox_inches='tight')
-    plt.close()
+    save_figure(fig, path)
+    plt.close(fig)
 
-def plot_3D(latent_space: np.ndarray, y_true: np.ndarray, path: str, title: str, logger, genre_filter: str, loader) -> None:
+def plot_3D(latent_space: np.ndarray, y_true: np.ndarray, path: str, title: str, logger, genre_filter: str, loader, unique_labels: np.ndarray = None, str_labels: list = None) -> None:
     """
     Plots a 3 dimensional latent representation in 3D space
 
@@ -133,31 +150,34 @@ def plot_3D(latent_space: np.ndarray, y_true: np.ndarray, path: str, title: str,
     :param logger: logger
     :param genre_filter: genre filters
     :param loader: dataset loader
+    :param unique_labels: unique true labels, computed from 'y_true' if set to None
+    :param str_labels: decoded unique labels, computed using 'loader' if set to None
     :return: None
     """
 
-    unique_labels = np.unique(y_true)
-    str_labels = loader.decode_label(unique_labels)
+    if unique_labels is None:
+        unique_labels = np.unique(y_true)
+    if str_labels is None:
+        str_labels = loader.decode_label(unique_labels)
     print(latent_space.shape)
-    fig = plt.figure(figsize=(10, 8))
+    fig = plt.figure(figsize=(10, 8), constrained_layout=True)
     ax = fig.add_subplot(111, projection='3d')
-    scatter = ax.scatter(latent_space[:, 0], latent_space[:, 1], latent_space[:, 2], c=y_true, cmap=CMAP, alpha=0.7, s=10)
+    scatter = ax.scatter(latent_space[:, 0], latent_space[:, 1], latent_space[:, 2], c=y_true, cmap=CMAP, alpha=0.7, s=10, rasterized=True)
     colour_bar = plt.colorbar(scatter, ax=ax, label="Cluster Labels")
     colour_bar.set_ticks(unique_labels)
     colour_bar.set_ticklabels(str_labels)
 
-    ax.set_title(f"3D Visualisation of Latent Space (genres: {genre_filter})")
+    ax.set_title(f"{title} \n (genres: {genre_filter})")
     ax.set_xlabel("Axis 1")
     ax.set_ylabel("Axis 2")
     ax.set_zlabel("Axis 3")
 
     ax.grid(False)
-    plt.title(title)
-    plt.show()
-    plt.savefig(path, bbox_inches='tight')
+    save_figure(fig, path, dpi=200)
+    plt.close(fig)
     logger.info(f"Saved plot '{path}'")
 
-def plot_2D(latent_space: np.ndarray, y_true: np.ndarray, path: str, title: str, genre_filter: str, loader) -> None:
+def plot_2D(latent_space: np.ndarray, y_true: np.ndarray, path: str, title: str, genre_filter: str, loader, unique_labels: np.ndarray = None, str_labels: list = None) -> None:
     """
     Plots a 2 dimensional latent representation in 2D space
 
@@ -168,27 +188,30 @@ def plot_2D(latent_space: np.ndarray, y_true: np.ndarray, path: str, title: str,
     :param logger: logger
     :param genre_filter: genre filters
     :param loader: dataset loader
+    :param unique_labels: unique true labels, computed from 'y_true' if set to None
+    :param str_labels: decoded unique labels, computed using 'loader' if set to None
     :return: None
     """
-    unique_labels = np.unique(y_true)
-    str_labels = loader.decode_label(unique_labels)
+    if unique_labels is None:
+        unique_labels = np.unique(y_true)
+    if str_labels is None:
+        str_labels = loader.decode_label(unique_labels)
 
-    colours = [CMAP(i / (len(unique_labels) - 1)) for i in range(len(unique_labels))]
-    cmap = ListedColormap(colours)
+    cmap = get_cached_listed_cmap(len(unique_labels))
 
-    fig = plt.figure(figsize=(10, 8))
+    fig = plt.figure(figsize=(10, 8), constrained_layout=True)
     ax = fig.add_subplot(111)
-    scatter = ax.scatter(latent_space[:, 0], latent_space[:, 1], c=y_true, cmap=cmap, alpha=0.7, s=10)
+    scatter = ax.scatter(latent_space[:, 0], latent_space[:, 1], c=y_true, cmap=cmap, alpha=0.7, s=10, rasterized=True)
     colour_bar = plt.colorbar(scatter, ax=ax, label="Cluster Labels")
     colour_bar.set_ticks(unique_labels)
     colour_bar.set_ticklabels(str_labels)
 
-    ax.set_title(f"2D Visualisation of Latent Space (genres: {genre_filter})")
+    ax.set_title(f"{title} \n (genres: {genre_filter})")
     ax.set_xlabel("Axis 1")
     ax.set_ylabel("Axis 2")
     ax.grid(False)
-    plt.title(title)
-    plt.savefig(path, bbox_inches='tight')
+    save_figure(fig, path, dpi=200)
+    plt.close(fig)
 
 def plot_correlation_accuracy(latent_space, y_true, covariance_mat, label, max_n_neighbours: int = 100) -> None:
     """
@@ -201,11 +224,7 @@ def plot_correlation_accuracy(latent_space, y_true, covariance_mat, label, max_n
     :param max_n_neighbours: the maximum number of neighbours
     """
 
-    accuracy_scores = []
-    for n in range(1, max_n_neighbours + 1):
-        t_corr, p_corr = utils.correlation(latent_space=latent_space, y_true=y_true, covar=covariance_mat, n_neighbours=n)
-        acc = accuracy_score(t_corr, p_corr)
-        accuracy_scores.append(acc)
+    accuracy_scores = utils.correlation_sweep(latent_space=latent_space, y_true=y_true, covar=covariance_mat, max_n_neighbours=max_n_neighbours)
 
     plt.plot(range(1, max_n_neighbours + 1), accuracy_scores, label=label)
     plt.xlabel("Number of Neighbours")
@@ -227,7 +246,7 @@ def plot_shannon_entropy(n_clusters, avg_shannon_vals, label: str) -> None:
     plt.ylabel("Average Shannon Entropy")
     plt.legend()
 
-def plot_correlation_conf_mat(cf_matrix, class_labels, n_neighbours, path, **kwargs) -> None:
+def plot_correlation_conf_mat(cf_matrix, class_labels, n_neighbours, path, max_annotated_classes: int = 15, **kwargs) -> None:
     """
     Plot the confusion matrix
 
@@ -235,6 +254,7 @@ def plot_correlation_conf_mat(cf_matrix, class_labels, n_neighbours, path, **kwa
     :param class_labels: class labels
     :param n_neighbours: number of nearest neighbours
     :param path: path to save
+    :param max_annotated_classes: cells are only annotated with their counts when there are at most this many classes
     :param kwargs: kwargs corresponding to 'f1_score', 'precision', 'recall', and 'accuracy'
     """
 
@@ -244,40 +264,55 @@ def plot_correlation_conf_mat(cf_matrix, class_labels, n_neighbours, path, **kwa
     accuracy = kwargs["accuracy"]
     metrics_str = f"Accuracy: {accuracy:.2%}, Precision: {precision:.2%}, Recall: {recall:.2%}, F1 Score: {f1:.2%}"
 
-    sns.heatmap(cf_matrix, annot=True, fmt="d", xticklabels=class_labels, yticklabels=class_labels)
+    fig = plt.figure(constrained_layout=True)
+    plt.imshow(cf_matrix, cmap="Blues", aspect="auto", rasterized=True)
+    plt.colorbar()
+    plt.xticks(range(len(class_labels)), class_labels, rotation=90)
+    plt.yticks(range(len(class_labels)), class_labels)
+
+    if len(class_labels) <= max_annotated_classes:
+        threshold = cf_matrix.max() / 2
+        for (i, j), value in np.ndenumerate(cf_matrix):
+            plt.text(j, i, f"{value:d}", ha="center", va="center", color="white" if value > threshold else "black")
+
     plt.xlabel("Predicted Neighbour Labels")
     plt.ylabel("True Label")
     plt.title(f"Confusion Matrix when nearest_neighbours={n_neighbours} \n{metrics_str}")
-    plt.savefig(path, bbox_inches='tight')
-    plt.close()
+    save_figure(fig, path)
+    plt.close(fig)
 
-def plot_convex_clusters(latent_space, u_path, loader, y_true, path):
+def plot_convex_clusters(latent_space, u_path, loader, y_true, path, unique_labels=None, str_labels=None):
     """
     Plot the convex clustering heirarchy
 
     :param latent_space: latent space
-    :param u_path: cluster centre path
+    :param u_path: cluster centre path (shape: [T,N,2])
     :param loader: data loader
     :param y_true: true labels
     :param path: path to save
+    :param unique_labels: unique true labels, computed from 'y_true' if set to None
+    :param str_labels: decoded unique labels, computed using 'loader' if set to None
     """
 
-    fig = plt.figure(figsize=(10, 8))
+    fig = plt.figure(figsize=(10, 8), constrained_layout=True)
     ax = fig.add_subplot(111)
 
     # plot cluster center paths
-    for i in range(len(latent_space)):
-        cluster_path = np.array([U[i] for U in u_path])
-        ax.plot(cluster_path[:, 0], cluster_path[:, 1], color="black", alpha=0.3)
-        ax.scatter(cluster_path[:, 0], cluster_path[:, 1], color="black", s=3, alpha=0.3)
+    # transpose the (T, N, 2) path to (N, T, 2) so every point's path is drawn in one collection
+    segments = np.asarray(u_path).transpose(1, 0, 2)
+    ax.add_collection(LineCollection(segments, colors="black", alpha=0.3, rasterized=True))
+
+    points = segments.reshape(-1, 2)
+    ax.scatter(points[:, 0], points[:, 1], color="black", s=3, alpha=0.3, rasterized=True)
 
     # create colour bar labels
-    unique_labels = np.unique(y_true)
-    str_labels = loader.decode_label(unique_labels)
-    colours = [CMAP(i / (len(unique_labels) - 1)) for i in range(len(unique_labels))]
-    cmap = ListedColormap(colours)
+    if unique_labels is None:
+        unique_labels = np.unique(y_true)
+    if str_labels is None:
+        str_labels = loader.decode_label(unique_labels)
+    cmap = get_cached_listed_cmap(len(unique_labels))
 
-    scatter = ax.scatter(latent_space[:, 0], latent_space[:, 1], c=y_true, cmap=cmap, s=20)
+    scatter = ax.scatter(latent_space[:, 0], latent_space[:, 1], c=y_true, cmap=cmap, s=20, rasterized=True)
     colour_bar = plt.colorbar(scatter, ax=ax, label="Cluster Labels")
     colour_bar.set_ticks(unique_labels)
     colour_bar.set_ticklabels(str_labels)
@@ -285,16 +320,17 @@ def plot_convex_clusters(latent_space, u_path, loader, y_true, path):
     ax.set_title("Convex Clustering")
     ax.set_xlabel("Axis 1")
     ax.set_ylabel("Axis 2")
-    plt.savefig(path, bbox_inches='tight')
-    plt.close()
+    save_figure(fig, path, dpi=200)
+    plt.close(fig)
 
-def plot_classifier_scores(data: dict, classifier_labels: list, path: str) -> None:
+def plot_classifier_scores(data: dict, classifier_labels: list, path: str, max_labelled_bars: int = 20) -> None:
     """
     Plot classifier scores on a bar chart
 
     :param data: score data
     :param classifier_labels: classifier names
     :param path: path to save
+    :param max_labelled_bars: a signal processor's bars are only labelled with their scores when it has fewer bars than this
     :return:
     """
 
@@ -302,18 +338,18 @@ def plot_classifier_scores(data: dict, classifier_labels: list, path: str) -> No
     width = 0.1
     multiplier = 0
 
-    fig, ax = plt.subplots(figsize=(20, 6))
+    fig, ax = plt.subplots(figsize=(20, 6), constrained_layout=True)
 
     for signal_processor, accuracy_scores in data.items():
         offset = width * multiplier
         rects = ax.bar(x + offset, accuracy_scores, width, label=signal_processor)
-        ax.bar_label(rects, padding=3, fmt="%.2f")
+        if len(accuracy_scores) < max_labelled_bars:
+            ax.bar_label(rects, padding=3, fmt="%.2f")
         multiplier += 1
 
-    ax.set_title("Comparison of the Accuracy Between a set of Multi-classifiers and Different Preprocessed Datasets")
     ax.set_ylabel("Accuracy Scores")
     ax.set_title("Classifier Accuracy Scores per Signal Processor")
     ax.set_xticks(x + width, classifier_labels)
     ax.legend()
-    plt.savefig(path, bbox_inches='tight')
-    plt.close()
\ No newline at end of file
+    save_figure(fig, path)
+    plt.close(fig)
\ No newline at end of file